@@ -15,6 +15,15 @@ CARACTS_SPE = ["&", "~", '"', "#", "'", "{", "(", "[", "-", "|", "`", "_", "^",
                "@", ")", "]", "°", "+", "=", "}", "¨", "£", "$", "¤", "%", "µ",
                "*", "!", "§", ":", ";", ".", ",", "?"]
 
+# Evaluation tiers of the password check.
+TIERS = ["fast", "full", "auto"]
+
+# Approximate memory (bytes) used by each entry of a loaded dictionary,
+# in addition to the size of the word itself (zxcvbn ranked dictionary slot and rank).
+DICTIONARY_ENTRY_MEMORY = 100
+# Number of characters read at the beginning of a dictionary to estimate the memory it needs.
+DICTIONARY_DEMAND_SAMPLE = 65536
+
 # Comment on the password score.
 SCORE_TO_WORD = {
     0: "Very weak",
@@ -2,10 +2,13 @@ import configparser
 import os
 from secrets import choice, randbelow
 from math import log
+from sys import getsizeof
 
 from zxcvbn import zxcvbn
 from zxcvbn.matching import add_frequency_lists
+from zxcvbn.time_estimates import estimate_attack_times
 
+from modules import ngram
 from modules.data import *
 
 # User configuration file.
@@ -14,6 +17,8 @@ config.read(os.path.realpath(__file__)[:-21] + os.sep + 'tkp.conf')
 replace_path = config["GLOBAL"]["DICTIONNARY_DIRECTORY"].replace("PROG_PATH",
                                                                  os.path.realpath(__file__)[:-21])
 config["GLOBAL"]["DICTIONNARY_DIRECTORY"] = replace_path
+config["CHECK"]["NGRAM_MODEL_FILE"] = config["CHECK"]["NGRAM_MODEL_FILE"].replace("PROG_PATH",
+                                                                          os.path.realpath(__file__)[:-21])
 
 
 def export_file(content, path):
@@ -30,32 +35,174 @@ def export_file(content, path):
         raise SystemExit(f"Unable to write the file: {e}")
 
 
-def check_password(password, infos_sup=None, files_wordlists=[]):
-    """ Evaluates the strength of the password according to several criteria. Powered by zxcvbn. """
-
-    # --- Load the dictionaries and add them to zxcvbn.
-    dict_wordlists = {}
-    # Default location dictionaries (defined in the config file).
-    for file_name in os.listdir(config["GLOBAL"]["DICTIONNARY_DIRECTORY"]):
-        with open(config["GLOBAL"]["DICTIONNARY_DIRECTORY"] + os.sep + file_name, "r") as f:
-            list_actual_dict = f.read().split("\n")[:-1]
-        dict_wordlists[os.path.splitext(file_name)[0]] = list_actual_dict
-        add_frequency_lists(dict_wordlists)
-    # Additional dictionaries added as arguments.
-    for file in files_wordlists:
-        with file as f:
-            list_actual_dict = f.read().split("\n")[:-1]
-        file_name = str(file).replace("<_io.TextIOWrapper name='",
-                                      "").replace("' mode='r' encoding='UTF-8'>", "")
-        dict_wordlists[os.path.splitext(os.path.split(file_name)[1])[0]] = list_actual_dict
-        add_frequency_lists(dict_wordlists)
-
-    # --- Gets the password results with zxcvbn and displays the score.
+def stream_wordlist(f, max_rank, budget, report):
+    """ Yields the first words of an open word list, within the rank and memory limits.
+
+    The file is read line by line, the words beyond the limits are only counted.
+
+    Arguments:
+       f        -- The open word list file, one word per line, most common first.
+       max_rank -- Maximum number of words to keep (int, 0 for no limit).
+       budget   -- Memory available for this list in bytes (int, None for no limit).
+       report   -- Report of the list, 'kept', 'total' and 'memory' are updated (dict).
+    """
+
+    keeping = True
+    for line in f:
+        word = line.rstrip("\r\n")
+        if not word:
+            continue
+        report["total"] += 1
+        if keeping and max_rank and report["kept"] >= max_rank:
+            keeping = False
+        if keeping:
+            size = getsizeof(word) + DICTIONARY_ENTRY_MEMORY
+            if budget is not None and report["memory"] + size > budget:
+                keeping = False  # Only the most common words are kept, the following ones are skipped.
+            else:
+                report["memory"] += size
+                report["kept"] += 1
+                yield word
+
+
+def dictionary_max_rank(name):
+    """ Maximum number of entries kept from the dictionary (configuration file, 0 for no limit). """
+
+    return config.getint("MAX_RANK", name, fallback=config.getint("CHECK", "DEFAULT_MAX_RANK"))
+
+
+def dictionary_demand(f, size, max_rank):
+    """ Estimated memory (bytes) needed to load a whole word list, within its MAX_RANK.
+
+    The size of the entries is estimated from the beginning of the file.
+
+    Arguments:
+       f        -- The open word list file.
+       size     -- Size of the file in bytes (int).
+       max_rank -- Maximum number of words to keep (int, 0 for no limit).
+    """
+
+    if not f.seekable():
+        return float("inf")  # Unknown size (pipe): loaded last, with the budget left.
+    sample = f.read(DICTIONARY_DEMAND_SAMPLE)
+    f.seek(0)
+    words = [line.rstrip("\r") for line in sample.split("\n") if line.strip()]
+    if not words:
+        return 0
+    if len(sample) < DICTIONARY_DEMAND_SAMPLE:
+        nb_entries = len(words)  # The whole file was read.
+    else:
+        nb_entries = size * len(words) / len(sample.encode("utf-8", "replace"))
+    if max_rank:
+        nb_entries = min(nb_entries, max_rank)
+    return nb_entries * (DICTIONARY_ENTRY_MEMORY + sum(getsizeof(word) for word in words) / len(words))
+
+
+def load_dictionaries(files_wordlists=[]):
+    """ Load the dictionaries and add them to zxcvbn.
+
+    Each list is limited to its MAX_RANK first entries,
+    and all the lists together to the DICTIONARIES_MEMORY_BUDGET (configuration file).
+    The budget is shared between the lists: from the smallest estimated demand to the largest,
+    each list gets an equal part of the budget left, the part it does not use goes to the next ones.
+
+    Return:
+       Report of each list: name, number of words kept and in total (list of dict).
+    """
+
+    budget_mb = config.getfloat("CHECK", "DICTIONARIES_MEMORY_BUDGET")
+    budget_left = int(budget_mb * 1024 * 1024) if budget_mb > 0 else None
+    # Default location dictionaries (defined in the config file), then additional dictionaries added as arguments.
+    files = [config["GLOBAL"]["DICTIONNARY_DIRECTORY"] + os.sep + file_name
+             for file_name in sorted(os.listdir(config["GLOBAL"]["DICTIONNARY_DIRECTORY"]))]
+    files += files_wordlists
+    reports = []
+    demands = []
+    for file in files:
+        file_name = file if isinstance(file, str) else file.name
+        name = os.path.splitext(os.path.split(file_name)[1])[0]
+        reports.append({"name": name, "kept": 0, "total": 0, "memory": 0})
+        if budget_left is None:
+            demands.append(0)  # No budget to share: the order does not matter.
+        elif isinstance(file, str):
+            with open(file, "r") as f:
+                demands.append(dictionary_demand(f, os.path.getsize(file), dictionary_max_rank(name)))
+        else:
+            demands.append(dictionary_demand(file, os.fstat(file.fileno()).st_size, dictionary_max_rank(name)))
+    order = sorted(range(len(files)), key=lambda i: demands[i])
+    for nb_loaded, i in enumerate(order):
+        report = reports[i]
+        budget = None if budget_left is None else budget_left // (len(order) - nb_loaded)
+        with (open(files[i], "r") if isinstance(files[i], str) else files[i]) as f:
+            add_frequency_lists({report["name"]: stream_wordlist(f, dictionary_max_rank(report["name"]),
+                                                                 budget, report)})
+        if budget_left is not None:
+            budget_left -= report["memory"]
+    return reports
+
+
+def fast_password_result(password):
+    """ Evaluates the password with the n-gram model only (fast tier).
+
+    Return:
+       A result with the same keys as zxcvbn used by check_password (dict).
+    """
+
+    max_ranks = {os.path.splitext(file_name)[0]: dictionary_max_rank(os.path.splitext(file_name)[0])
+                 for file_name in os.listdir(config["GLOBAL"]["DICTIONNARY_DIRECTORY"])}
+    costs = ngram.load_model(config["GLOBAL"]["DICTIONNARY_DIRECTORY"], config["CHECK"]["NGRAM_MODEL_FILE"],
+                             max_ranks)
+    guesses = ngram.estimate_guesses(password, costs)
+    pattern = ngram.has_pattern(password)
+    if pattern:
+        # The model overestimates patterns: the password is never rated above Weak without zxcvbn.
+        guesses = min(guesses, ngram.PATTERN_MAX_GUESSES)
+    result = estimate_attack_times(guesses)
+    result["guesses"] = guesses
+    result["feedback"] = {"warning": "", "suggestions": []}
+    if pattern:
+        result["feedback"]["warning"] = ("Repeats, sequences, keyboard patterns or dates found:"
+                                         " the fast estimation is unreliable, use --tier full.")
+    result["sequence"] = []
+    return result
+
+
+def check_password(password, infos_sup=None, files_wordlists=[], tier="full"):
+    """ Evaluates the strength of the password according to several criteria. Powered by zxcvbn.
+
+    tier -- 'full' for zxcvbn, 'fast' for the n-gram model only,
+            'auto' for the n-gram model with zxcvbn for borderline passwords.
+    """
+
     if not password:
         raise SystemExit("ValueError: The password is empty.")
-    result = zxcvbn(password, infos_sup)
+    if tier not in TIERS:
+        raise SystemExit(f"ValueError: Unknown tier '{tier}' (choose from {', '.join(TIERS)}).")
+
+    # --- Fast tier: the n-gram model decides alone if the estimation is clear enough.
+    # Additional information and word lists are unknown to the model, zxcvbn is needed.
+    result = None
+    if tier == "fast":
+        result = fast_password_result(password)
+    elif tier == "auto" and not infos_sup and not files_wordlists:
+        result = fast_password_result(password)
+        if not ngram.is_decisive(password, result["guesses"],
+                                 config.getfloat("CHECK", "FAST_TIER_WEAK_GUESSES"),
+                                 config.getfloat("CHECK", "FAST_TIER_STRONG_GUESSES")):
+            result = None
+    fast_tier = result is not None
+
+    if not fast_tier:
+        dictionaries_report = load_dictionaries(files_wordlists)
+
+        # --- Gets the password results with zxcvbn.
+        result = zxcvbn(password, infos_sup)
+
+    # --- Displays the score.
     print(f"    Entropy: {round(log(result['guesses'], 2), 1)}"
           f"             {SCORE_TO_WORD[result['score']]} ({str(result['score'])}/4)")
+    if fast_tier:
+        print("    Estimated with the fast n-gram model.")
 
     # --- Shows the estimated time.
     print("\nEstimated time needed to guess the password: ")
@@ -122,6 +269,9 @@ def check_password(password, infos_sup=None, files_wordlists=[]):
 
     # --- Exposure in dictionaries.
     print("\nExposure report:")
+    if fast_tier:
+        print("    Not available with the fast tier.")
+        return
     no_matches_found = True
     for exposed in result["sequence"]:
         try:
@@ -132,6 +282,12 @@ def check_password(password, infos_sup=None, files_wordlists=[]):
     if no_matches_found:
         print("    No matches found.")
 
+    # --- Part of each dictionary loaded.
+    print("\nDictionaries loaded:")
+    for report in dictionaries_report:
+        percent = round(100 * report["kept"] / report["total"], 1) if report["total"] else 100
+        print(f"    {report['name']}: {report['kept']}/{report['total']} entries ({percent}%)")
+
 
 def password_from_sentence(sentence):
     """ Create a phrase-based password.
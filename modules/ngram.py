@@ -0,0 +1,239 @@
+""" Fast password strength estimator.
+
+A character trigram (Markov) model trained on the dictionaries folder.
+The model is stored as a flat table of costs (bits) backed by an array,
+cached on disk so that it loads in a few milliseconds.
+Used as a first tier before the full zxcvbn evaluation.
+"""
+
+import os
+from array import array
+from math import log2
+
+from zxcvbn.adjacency_graphs import ADJACENCY_GRAPHS
+
+# Version of the model, part of the cache signature: a cache of another version is trained again.
+MODEL_VERSION = 3
+
+# Alphabet of the model: 0 is the start / end of the password,
+# 1 to 95 are the printable ASCII characters, 96 is any other character.
+ALPHABET_SIZE = 97
+CHAR_TO_INDEX = {chr(c): c - 31 for c in range(32, 127)}
+OTHER_INDEX = 96
+# Additive smoothing of the trigram counts.
+SMOOTHING = 0.01
+# Weight of the first word of each list, the word of rank r weighs 1 + RANK_WEIGHT // r.
+RANK_WEIGHT = 10000
+# Maximum cost of a character, the brute force cardinality of zxcvbn (10 guesses per character).
+MAX_CHAR_COST = log2(10)
+
+# Minimum length of the patterns (keyboard walk, sequence, digits) that the model cannot estimate.
+MIN_PATTERN_LENGTH = 4
+# Maximum number of guesses of a password with a pattern in the fast tier (zxcvbn score 2 at most).
+PATTERN_MAX_GUESSES = 1e8
+
+# Neighbouring keys of each key on the keyboards known by zxcvbn.
+KEYBOARD_NEIGHBOURS = {}
+for graph_name in ("qwerty", "keypad"):
+    for key, neighbours in ADJACENCY_GRAPHS[graph_name].items():
+        KEYBOARD_NEIGHBOURS.setdefault(key, set()).update("".join(n for n in neighbours if n))
+
+_loaded_model = None
+
+
+def dictionaries_signature(directory, max_ranks={}):
+    """ Identifies the model version and the state of the dictionaries folder
+    (names, sizes, dates and rank limits of files). """
+
+    signature = [f"v{MODEL_VERSION}"]
+    for file_name in sorted(os.listdir(directory)):
+        stat = os.stat(directory + os.sep + file_name)
+        max_rank = max_ranks.get(os.path.splitext(file_name)[0], 0)
+        signature.append(f"{file_name}:{stat.st_size}:{int(stat.st_mtime)}:{max_rank}")
+    return "|".join(signature)
+
+
+def train_model(directory, max_ranks={}):
+    """ Train the trigram model on every file of the dictionaries folder.
+
+    Arguments:
+       directory -- Folder of the word lists (str).
+       max_ranks -- Maximum number of words read from each list,
+                    by file name without extension (dict, 0 or missing for no limit).
+
+    Return:
+       Costs in bits of each transition (array of float).
+       The cost of the character c after a and b is at the index (a * 97 + b) * 97 + c.
+    """
+
+    size = ALPHABET_SIZE
+    counts = array("I", bytes(4 * size ** 3))
+    for file_name in sorted(os.listdir(directory)):
+        max_rank = max_ranks.get(os.path.splitext(file_name)[0], 0)
+        with open(directory + os.sep + file_name, "r", errors="replace") as f:
+            rank = 0
+            for word in f:
+                word = word.rstrip("\r\n").lower()
+                if not word:
+                    continue  # Empty lines are not counted in the rank, as in the zxcvbn dictionaries.
+                rank += 1
+                if max_rank and rank > max_rank:
+                    break  # The rest of the list is not read.
+                # The lists are sorted by frequency: the first words weigh more.
+                weight = 1 + RANK_WEIGHT // rank
+                a = b = 0
+                for char in word:
+                    c = CHAR_TO_INDEX.get(char, OTHER_INDEX)
+                    counts[(a * size + b) * size + c] += weight
+                    a, b = b, c
+                counts[(a * size + b) * size] += weight
+
+    costs = array("f", bytes(4 * size ** 3))
+    for context in range(size * size):
+        start = context * size
+        total = sum(counts[start:start + size]) + SMOOTHING * size
+        for c in range(size):
+            costs[start + c] = min(log2(total / (counts[start + c] + SMOOTHING)), MAX_CHAR_COST)
+    return costs
+
+
+def load_model(directory, cache_file, max_ranks={}):
+    """ Load the model from the cache file, train it if the cache is missing or outdated.
+
+    Arguments:
+       directory  -- Folder of the word lists used to train the model (str).
+       cache_file -- File where the trained model is stored (str).
+       max_ranks  -- Maximum number of words read from each list (dict, see train_model).
+
+    Return:
+       Costs in bits of each transition (array of float).
+    """
+
+    global _loaded_model
+    if _loaded_model is not None:
+        return _loaded_model
+    signature = dictionaries_signature(directory, max_ranks).encode("utf-8", "replace")
+    try:
+        with open(cache_file, "rb") as f:
+            if f.readline().rstrip(b"\n") == signature:
+                costs = array("f")
+                costs.fromfile(f, ALPHABET_SIZE ** 3)
+                _loaded_model = costs
+                return costs
+    except (OSError, EOFError):
+        pass  # Missing, outdated or truncated cache: the model is trained again.
+    costs = train_model(directory, max_ranks)
+    try:
+        with open(cache_file, "wb") as f:
+            f.write(signature + b"\n")
+            costs.tofile(f)
+    except OSError:
+        pass  # The model still works without a cache, it is just trained at each launch.
+    _loaded_model = costs
+    return costs
+
+
+def estimate_guesses(password, costs):
+    """ Estimated number of guesses needed to find the password.
+
+    Sum of the costs of each trigram of the password (lowercase),
+    plus a penalty for the capital letters.
+
+    Arguments:
+       password -- The password to estimate (str).
+       costs    -- The model returned by load_model (array of float).
+
+    Return:
+       Number of guesses (float).
+    """
+
+    size = ALPHABET_SIZE
+    bits = 0.0
+    a = b = 0
+    for char in password.lower():
+        c = CHAR_TO_INDEX.get(char, OTHER_INDEX)
+        bits += costs[(a * size + b) * size + c]
+        a, b = b, c
+    bits += costs[(a * size + b) * size]
+    # Capital letters: 1 bit for the common cases (first letter or all), 1 bit per letter otherwise.
+    nb_upper = sum(1 for char in password if char.isupper())
+    if nb_upper:
+        if nb_upper == len(password) or (nb_upper == 1 and password[0].isupper()):
+            bits += 1
+        else:
+            bits += nb_upper
+    return 2 ** min(bits, 1000)
+
+
+def has_pattern(password):
+    """ True if the password contains a pattern that the trigram model overestimates:
+    repeats, sequences (abcd, 9753), keyboard walks (qwer, 1qaz) or runs of digits (dates).
+    """
+
+    length = len(password)
+    # Repeats: a character three times (aaa) or a block followed by itself (abab, passwordpassword).
+    for i in range(length):
+        if password[i:i + 3] == password[i] * 3:
+            return True
+        for size in range(2, (length - i) // 2 + 1):
+            if password[i:i + size] == password[i + size:i + 2 * size]:
+                return True
+    run_sequence = run_walk = run_digits = 1
+    for i in range(1, length):
+        previous, char = password[i - 1], password[i]
+        delta = ord(char) - ord(previous)
+        if i > 1 and 0 < abs(delta) <= 5 and delta == ord(previous) - ord(password[i - 2]):
+            run_sequence += 1
+        else:
+            run_sequence = 2 if 0 < abs(delta) <= 5 else 1
+        run_walk = run_walk + 1 if char in KEYBOARD_NEIGHBOURS.get(previous, ()) else 1
+        run_digits = run_digits + 1 if char.isdigit() and previous.isdigit() else 1
+        if max(run_sequence, run_walk, run_digits) >= MIN_PATTERN_LENGTH:
+            return True
+    return False
+
+
+def is_decisive(password, guesses, weak_guesses, strong_guesses):
+    """ True if the estimation is clearly weak or clearly strong,
+    False if the password must be checked with the full zxcvbn evaluation.
+
+    A strong estimation is never trusted when the password contains a pattern (see has_pattern).
+    """
+
+    if guesses < weak_guesses:
+        return True
+    return guesses > strong_guesses and not has_pattern(password)
+
+
+def agreement_rate(passwords, costs, weak_guesses, strong_guesses):
+    """ Measures the agreement of the fast tier with zxcvbn on a reference corpus.
+
+    A decisive weak estimation agrees if zxcvbn gives a score of 0 or 1,
+    a decisive strong estimation agrees if zxcvbn gives a score of 4.
+
+    Arguments:
+       passwords      -- The reference corpus (list of str).
+       costs          -- The model returned by load_model (array of float).
+       weak_guesses   -- Below this number of guesses, the password is weak.
+       strong_guesses -- Above this number of guesses, the password is strong.
+
+    Return:
+       (agreement rate on decisive weak passwords, agreement rate on decisive strong passwords,
+        part of decisive passwords) (tuple of float, a rate is None without decisive password)
+    """
+
+    from zxcvbn import zxcvbn
+
+    decisive = {"weak": 0, "strong": 0}
+    agree = {"weak": 0, "strong": 0}
+    for password in passwords:
+        guesses = estimate_guesses(password, costs)
+        if not is_decisive(password, guesses, weak_guesses, strong_guesses):
+            continue
+        side = "weak" if guesses < weak_guesses else "strong"
+        decisive[side] += 1
+        score = zxcvbn(password)["score"]
+        if (side == "weak" and score <= 1) or (side == "strong" and score == 4):
+            agree[side] += 1
+    rates = [agree[side] / decisive[side] if decisive[side] else None for side in ("weak", "strong")]
+    return rates[0], rates[1], (decisive["weak"] + decisive["strong"]) / len(passwords)
@@ -0,0 +1,13 @@
+""" Tests of the password check helpers. """
+
+import pytest
+
+from modules import functions
+from test_ngram import WEAK_PATTERNS
+
+
+@pytest.mark.parametrize("password", WEAK_PATTERNS + ["aaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"])
+def test_fast_tier_never_strong_on_patterns(password):
+    result = functions.fast_password_result(password)
+    assert result["score"] <= 2
+    assert result["feedback"]["warning"]
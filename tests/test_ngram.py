@@ -0,0 +1,99 @@
+""" Tests of the fast n-gram tier against zxcvbn. """
+
+import os
+import random
+import string
+
+import pytest
+
+from modules import ngram
+
+PROG_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DICTIONNARY_DIRECTORY = PROG_PATH + os.sep + "dictionaries"
+MORE_DATA_DIRECTORY = PROG_PATH + os.sep + "more data (unused)"
+
+# Default limits of the auto tier (tkp.conf).
+WEAK_GUESSES = 1e6
+STRONG_GUESSES = 1e14
+
+# Weak patterns that the trigram model alone overestimates.
+WEAK_PATTERNS = [
+    "passwordpasswordpassword",
+    "abcdefghijklmnopqrs",
+    "qwertyuiopasdfghjkl",
+    "1qaz2wsx3edc4rfv5tgb",
+    "!@#$%^&*()_+!@#$%^&*",
+    "zyxwvutsrqponmlkjihg",
+    "Xk9#qLm2aaaaaaaaaaaaaaaa",
+    "correct19850714horsebattery",
+]
+
+
+def read_words(directory, file_name):
+    with open(directory + os.sep + file_name, "r", errors="replace") as f:
+        return [line.rstrip("\r\n") for line in f if line.strip()]
+
+
+@pytest.fixture(scope="module")
+def costs():
+    return ngram.train_model(DICTIONNARY_DIRECTORY)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """ Reference corpus built from the unused data, without any entry of the training dictionaries. """
+
+    training = set()
+    for file_name in os.listdir(DICTIONNARY_DIRECTORY):
+        training.update(word.lower() for word in read_words(DICTIONNARY_DIRECTORY, file_name))
+    names = []
+    for file_name in ("prenoms.txt", "english surnames.txt", "usernames.txt"):
+        names += read_words(MORE_DATA_DIRECTORY, file_name)
+    words = read_words(MORE_DATA_DIRECTORY, "mots français.txt")
+    symbols = "!@#$%&*?-_"
+    rng = random.Random(2022)
+
+    passwords = []
+    for _ in range(400):
+        name = rng.choice(names)
+        passwords.append(rng.choice([name, name + rng.choice(symbols),
+                                     name.capitalize() + str(rng.randint(0, 99)), name + rng.choice(names)]))
+    for _ in range(400):
+        passwords.append("".join(rng.choice(string.ascii_letters + string.digits + symbols)
+                                 for _ in range(rng.randint(8, 24))))
+    for _ in range(200):
+        passwords.append(rng.choice(symbols).join(rng.choice(words) for _ in range(rng.randint(3, 5))))
+    return [password for password in passwords if password.lower() not in training]
+
+
+def test_agreement_with_zxcvbn(corpus, costs):
+    weak_rate, strong_rate, decisive_part = ngram.agreement_rate(corpus, costs, WEAK_GUESSES, STRONG_GUESSES)
+    print(f"\nAgreement with zxcvbn: weak {weak_rate:.1%}, strong {strong_rate:.1%},"
+          f" decisive {decisive_part:.1%} of {len(corpus)} passwords")
+    assert weak_rate >= 0.9
+    assert strong_rate >= 0.97
+    assert decisive_part >= 0.3
+
+
+@pytest.mark.parametrize("password", WEAK_PATTERNS)
+def test_weak_patterns_never_decisive_strong(password, costs):
+    assert ngram.has_pattern(password)
+    guesses = ngram.estimate_guesses(password, costs)
+    assert not (ngram.is_decisive(password, guesses, WEAK_GUESSES, STRONG_GUESSES) and guesses > STRONG_GUESSES)
+
+
+def test_common_password_decisive_weak(costs):
+    guesses = ngram.estimate_guesses("password", costs)
+    assert guesses < WEAK_GUESSES
+    assert ngram.is_decisive("password", guesses, WEAK_GUESSES, STRONG_GUESSES)
+
+
+def test_max_rank_ignores_empty_lines(tmp_path):
+    with_blanks = tmp_path / "with_blanks"
+    without_blanks = tmp_path / "without_blanks"
+    with_blanks.mkdir()
+    without_blanks.mkdir()
+    (with_blanks / "list.txt").write_text("\n\nazerty\n\nsoleil\nchocolat\n")
+    (without_blanks / "list.txt").write_text("azerty\nsoleil\n")
+    assert (ngram.train_model(str(with_blanks), {"list": 2})
+            == ngram.train_model(str(without_blanks), {"list": 2}))
@@ -98,7 +98,7 @@ class TkpCli(object):
     def check(self):
         parser = argparse.ArgumentParser(description="Test the strength of a password.",
                                          usage="tkp.py {check|c} [-h] [-p PASSWORD | --getpass | --clipboard]"
-                                               "\n       [-i INFO [INFO ...]] [--wordlist FILE [FILE ...]]")
+                                               "\n       [-i INFO [INFO ...]] [--wordlist FILE [FILE ...]] [--tier {fast,full,auto}]")
         group_check_password = parser.add_mutually_exclusive_group(required=False)
         group_check_password.add_argument("--password", "-p", metavar="PASSWORD", type=str,
                                           help="The password to check")
@@ -112,7 +112,17 @@ class TkpCli(object):
         parser.add_argument("--wordlist", "-w", type=argparse.FileType('r'),
                             nargs="+", metavar="FILE", default=[],
                             help="Additional word list files to load")
+        default_tier = config["CHECK"]["DEFAULT_TIER"].strip().lower()
+        if default_tier not in TIERS:
+            raise SystemExit(f"ValueError: The default tier '{config['CHECK']['DEFAULT_TIER']}' is invalid"
+                             f" (choose from {', '.join(TIERS)}).\n"
+                             "Check the value of DEFAULT_TIER in the configuration file.")
+        parser.add_argument("--tier", "-t", choices=TIERS, default=default_tier,
+                            help="Evaluation tier: fast n-gram model, full zxcvbn evaluation"
+                                 " or auto (zxcvbn only for borderline passwords)")
         args = parser.parse_args(sys.argv[2:])
+        if args.tier == "fast" and (args.info or args.wordlist):
+            parser.error("--info and --wordlist are not used by the fast tier. Use --tier auto or full.")
 
         if args.password not in [False, None]:
             password = args.password
@@ -126,7 +136,8 @@ class TkpCli(object):
         else:
             password = getpass.getpass()
             print()
-        functions.check_password(password, infos_sup=args.info, files_wordlists=args.wordlist)
+        functions.check_password(password, infos_sup=args.info, files_wordlists=args.wordlist,
+                                 tier=args.tier)
 
     def password(self):
         parser = argparse.ArgumentParser(parents=[parent_parser_generation],